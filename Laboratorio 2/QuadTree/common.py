@@ -1,8 +1,7 @@
 import bisect
+import math
 from collections import namedtuple
 
-from scipy.spatial.distance import euclidean
-
 NO_QUADRANT = -1
 NORTH_WEST = 1
 NORTH_EAST = 2
@@ -91,7 +90,7 @@ def compute_knn(points, point, k):
     for p in points:
         if p == point: continue
 
-        dist = euclidean(point, p)
+        dist = math.hypot(point[X] - p[X], point[Y] - p[Y])
         neighbor = (dist, p)
 
         if len(neighbors) < k:
@@ -1,3 +1,5 @@
+import numpy as np
+
 from common import *
 
 class TreeNode:
@@ -183,4 +185,55 @@ class TreeNode:
             points_count = self._count_points(Boundary(point, dimension))
 
         points = self.query_range(Boundary(point, dimension))
-        return compute_knn(points, point, k)
\ No newline at end of file
+        return compute_knn(points, point, k)
+
+    def batch_knn(self, points, k):
+        """ knn para todos los puntos a la vez, recorriendo el árbol una vez """
+        if k <= 0:
+            raise Exception("ERROR number of neighbors must be > 0")
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(points)
+        best_dists = np.full((n, k), np.inf)
+        best_ids = np.full((n, k), -1)
+        found = []
+
+        stack = [(self, np.arange(n))]
+        while stack:
+            node, active = stack.pop()
+
+            # distancia de cada consulta al límite del nodo (0 si está adentro)
+            cx, cy = node.boundary[CENTER]
+            d = node.boundary[DIMENSION]
+            dx = np.maximum(np.abs(points[active, X] - cx) - d, 0)
+            dy = np.maximum(np.abs(points[active, Y] - cy) - d, 0)
+            active = active[np.hypot(dx, dy) <= best_dists[active].max(axis=1)]
+            if not len(active):
+                continue
+
+            if node._points:
+                pts = list(node._points)
+                coords = np.array(pts, dtype=float)
+                dists = np.hypot(points[active, X, None] - coords[:, X],
+                                 points[active, Y, None] - coords[:, Y])
+                ids = np.broadcast_to(len(found) + np.arange(len(pts)), dists.shape).copy()
+                # como compute_knn, se ignora el mismo punto
+                same = dists == 0
+                dists[same] = np.inf
+                ids[same] = -1
+                found += pts
+
+                # quedarse con los k mejores entre los actuales y los nuevos
+                dists = np.concatenate([best_dists[active], dists], axis=1)
+                ids = np.concatenate([best_ids[active], ids], axis=1)
+                keep = np.argpartition(dists, k - 1, axis=1)[:, :k]
+                best_dists[active] = np.take_along_axis(dists, keep, axis=1)
+                best_ids[active] = np.take_along_axis(ids, keep, axis=1)
+
+            for child in node._nodes.values():
+                stack.append((child, active))
+
+        order = np.argsort(best_dists, axis=1)
+        best_dists = np.take_along_axis(best_dists, order, axis=1)
+        best_ids = np.take_along_axis(best_ids, order, axis=1)
+        return [[(dist, found[i]) for dist, i in zip(dists, ids) if i >= 0]
+                for dists, ids in zip(best_dists.tolist(), best_ids.tolist())]
@@ -1,7 +1,5 @@
 import bisect
 
-from scipy.spatial.distance import euclidean
-
 from common import (NO_QUADRANT, NORTH_EAST, NORTH_WEST, SOUTH_EAST,
                     SOUTH_WEST, Boundary, Point, belongs, compute_knn,
                     intersects, quadrants)
@@ -40,4 +38,7 @@ class DynamicQuadTree:
         return self.root.query_range(boundary)
 
     def knn(self, point, k):
-        return self.root.knn(point, k)
\ No newline at end of file
+        return self.root.knn(point, k)
+
+    def batch_knn(self, points, k):
+        return self.root.batch_knn(points, k)
\ No newline at end of file
@@ -1,45 +1,33 @@
 from PIL import Image
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import  matplotlib.colors as mcolors
-from rgb_color import RGB_Color
-from rgb_quantizer import OctreeQuantizer
+from rgb_quantizer import OctreeQuantizer, pack_colors
 
 #  ---- inserta todos los colores de la imagen en octree
 def quantize_color(path,num):
     image = Image.open(path)
-    pixels = image.load()
-    width, height = image.size
+    pixels = np.asarray(image.convert('RGB'), dtype=np.uint8)
 
     octree = OctreeQuantizer()
 
-    # ---- agregar colores a octree
-    for j in xrange(height):
-        for i in xrange(width):
-            octree.add_color(RGB_Color(*pixels[i, j]))
+    # ---- agregar colores a octree (toda la imagen de una vez)
+    octree.add_colors(pixels)
 
     # ---- 256 colores para "num" bits por imagen de salida de píxel
     palette_object= octree.make_palette(num)
 
     # ---- guardar imagen de salida
-    out_image = Image.new('RGB', (width, height))
-    out_pixels = out_image.load()
-    for j in xrange(height):
-        for i in xrange(width):
-            index = octree.get_palette_index(RGB_Color(*pixels[i, j]))
-            color = palette_object[index]
-            out_pixels[i, j] = (color.red, color.green, color.blue)
-    out_image.save('img/sky/quantized_img/img%02d.png' % num)
+    # ---- (tabla color -> índice de paleta, una búsqueda por color distinto)
+    packed = pack_colors(pixels)
+    palette_lut = octree.get_palette_lut(packed)
+    palette_rgb = np.array([(color.red, color.green, color.blue)
+                            for color in palette_object], dtype=np.uint8)
+    out_image = Image.fromarray(palette_rgb[palette_lut[packed]])
+    out_image.save('img/sky/quantized_image/img%02d.png' % num)
 
     # ---- obtener la matriz de paleta de colores RGB
-    rgb_palette = []
-    for color in palette_object:
-        R = color.red / 255.0
-        G = color.green / 255.0
-        B = color.blue / 255.0
-        rgb = [R,G,B]
-        rgb_palette.append(rgb)
+    rgb_palette = palette_rgb / 255.0
 
     # ---- visualizar la paleta de colores
     img_palette = mcolors.ListedColormap(rgb_palette)
@@ -53,7 +41,7 @@ def quantize_color(path,num):
 
 def main():
   for i in [20]:
-      quantize_color('/img/sky.jpg',i)
+      quantize_color('img/sky.jpg',i)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,175 +1,447 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numba import njit
+
 from rgb_color import RGB_Color
 
-class OctreeNode(object):
+
+def part1by2(x):
+    """
+    separar los 8 bits de 'x' dejando dos bits en cero entre cada uno
+      (bit i -> bit 3*i), secuencia estándar de códigos de Morton
+    :param x: arreglo de enteros de 8 bits
+    :return: arreglo uint32 con los bits separados
+    """
+    x = np.asarray(x, dtype=np.uint32) & 0xFF
+    x = (x | (x << 8)) & 0x00F00F
+    x = (x | (x << 4)) & 0x0C30C3
+    x = (x | (x << 2)) & 0x249249
+    return x
+
+
+def morton_code(red, green, blue):
+    """
+    intercalar los bits de los tres canales en una palabra de 24 bits
+      el índice del nivel L queda en los bits (21 - 3*L) .. (23 - 3*L)
+    :param red:
+    :param green:
+    :param blue:
+    :return: arreglo uint32 con el código de Morton de cada color
+    """
+    return (part1by2(red) << 2) | (part1by2(green) << 1) | part1by2(blue)
+
+
+def pack_colors(pixels):
+    """
+    empaquetar los colores RGB en enteros 0xRRGGBB
+    :param pixels: arreglo (..., 3) uint8
+    :return: arreglo uint32 con un color empaquetado por píxel
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8)
+    return (pixels[..., 0].astype(np.uint32) << 16) | \
+           (pixels[..., 1].astype(np.uint32) << 8) | \
+           pixels[..., 2].astype(np.uint32)
+
+
+@njit(cache=True)
+def _morton_code(red, green, blue):
+    """
+    código de Morton de un solo color, igual que morton_code
+    :return: el entero de 24 bits con los canales intercalados
+    """
+    code = 0
+    for bit in range(8):
+        code |= ((red >> bit) & 1) << (3 * bit + 2)
+        code |= ((green >> bit) & 1) << (3 * bit + 1)
+        code |= ((blue >> bit) & 1) << (3 * bit)
+    return code
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _add_code(code, red, green, blue, first, children, level, first_pixel,
+              sum_red, sum_green, sum_blue, pixel_count, node_count, max_depth):
+    """
+    insertar un color bajando por el camino de su código de Morton
+      los nodos nuevos guardan 'first' como número de su primer píxel;
+      debe haber espacio para 'max_depth' nodos más
+    :return: la nueva cantidad de nodos
+    """
+    node = 0
+    for lvl in range(max_depth):
+        index = (code >> (21 - 3 * lvl)) & 7
+        child = children[node, index]
+        if child < 0:
+            child = node_count
+            node_count += 1
+            level[child] = lvl + 1
+            first_pixel[child] = first
+            children[node, index] = child
+        node = child
+    sum_red[node] += red
+    sum_green[node] += green
+    sum_blue[node] += blue
+    pixel_count[node] += 1
+    return node_count
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _add_colors(pixels, codes, start, offset, children, level, first_pixel,
+                sum_red, sum_green, sum_blue, pixel_count, node_count, max_depth):
+    """
+    insertar los píxeles desde 'start' bajando por el árbol de arreglos
+      cada nodo nuevo guarda 'offset' + p, el número global de su primer píxel;
+      se detiene si no quedan nodos libres para un camino completo
+    :return: (cantidad de nodos, índice del siguiente píxel a insertar)
+    """
+    capacity = level.shape[0]
+    for p in range(start, pixels.shape[0]):
+        if node_count + max_depth > capacity:
+            return node_count, p
+        node_count = _add_code(codes[p], pixels[p, 0], pixels[p, 1], pixels[p, 2],
+                               offset + p, children, level, first_pixel, sum_red,
+                               sum_green, sum_blue, pixel_count, node_count,
+                               max_depth)
+    return node_count, pixels.shape[0]
+
+
+@njit(cache=True, boundscheck=False)
+def _add_color(red, green, blue, first, children, level, first_pixel, sum_red,
+               sum_green, sum_blue, pixel_count, node_count, max_depth):
     """
-    clase nodo de octree para cuantificación
+    insertar un solo color ('red', 'green', 'blue')
+    :return: la nueva cantidad de nodos
+    """
+    return _add_code(_morton_code(red, green, blue), red, green, blue, first,
+                     children, level, first_pixel, sum_red, sum_green, sum_blue,
+                     pixel_count, node_count, max_depth)
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _merge(children, level, first_pixel, sum_red, sum_green, sum_blue,
+           pixel_count, node_count, other_children, other_first_pixel,
+           other_sum_red, other_sum_green, other_sum_blue, other_pixel_count,
+           offset):
+    """
+    sumar el árbol 'other' al árbol destino recorriendo ambos a la vez
+      los píxeles de 'other' se numeran a partir de 'offset' y cada nodo
+      se queda con el menor número de primer píxel;
+      los nodos que faltan en el destino se crean al final de los arreglos,
+      que deben tener espacio para todos los nodos de 'other'
+    :return: la nueva cantidad de nodos del destino
+    """
+    stack = np.empty((other_children.shape[0], 2), dtype=np.int32)
+    stack[0, 0] = 0
+    stack[0, 1] = 0
+    top = 1
+    while top > 0:
+        top -= 1
+        node = stack[top, 0]
+        other = stack[top, 1]
+        sum_red[node] += other_sum_red[other]
+        sum_green[node] += other_sum_green[other]
+        sum_blue[node] += other_sum_blue[other]
+        pixel_count[node] += other_pixel_count[other]
+        for index in range(8):
+            other_child = other_children[other, index]
+            if other_child < 0:
+                continue
+            child = children[node, index]
+            if child < 0:
+                child = node_count
+                node_count += 1
+                level[child] = level[node] + 1
+                children[node, index] = child
+            first = other_first_pixel[other_child] + offset
+            if first < first_pixel[child]:
+                first_pixel[child] = first
+            stack[top, 0] = child
+            stack[top, 1] = other_child
+            top += 1
+    return node_count
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _find_leaf(code, children, pixel_count):
+    """
+    bajar por el árbol con el código de Morton 'code' hasta la primera hoja
+    :return: el nodo hoja (-1 si el árbol está vacío)
+    """
+    node = 0
+    lvl = 0
+    while pixel_count[node] == 0:
+        child = children[node, (code >> (21 - 3 * lvl)) & 7]
+        if child < 0:
+            # usar el primer nodo hijo encontrado
+            for index in range(8):
+                if children[node, index] >= 0:
+                    child = children[node, index]
+                    break
+        if child < 0:
+            # nodo sin hijos ni píxeles: no hay hoja a la que llegar
+            return -1
+        node = child
+        lvl += 1
+    return node
+
+
+@njit(cache=True, boundscheck=False, nogil=True)
+def _get_palette_indices(codes, children, pixel_count, palette_index):
+    """
+    bajar por el árbol con cada código de Morton hasta la primera hoja
+    :return: el índice de paleta de cada código (-1 si el árbol está vacío)
+    """
+    result = np.empty(codes.shape[0], dtype=np.int32)
+    for p in range(codes.shape[0]):
+        node = _find_leaf(codes[p], children, pixel_count)
+        result[p] = palette_index[node] if node >= 0 else -1
+    return result
+
+
+@njit(cache=True, boundscheck=False)
+def _get_palette_index(red, green, blue, children, pixel_count, palette_index):
+    """
+    índice de paleta de un solo color ('red', 'green', 'blue')
+    :return: el índice de paleta (-1 si el árbol está vacío)
+    """
+    node = _find_leaf(_morton_code(red, green, blue), children, pixel_count)
+    return palette_index[node] if node >= 0 else -1
+
+
+@njit(cache=True, boundscheck=False)
+def _remove_leaves(nodes, children, sum_red, sum_green, sum_blue, pixel_count,
+                   leaf_count, color_count):
+    """
+    sumar los hijos de cada nodo de 'nodes' al nodo, en orden, hasta que
+      queden 'color_count' hojas o menos; los hijos dejan de ser hojas
+    :return: la cantidad de hojas después de reducir
+    """
+    for node in nodes:
+        if leaf_count <= color_count:
+            break
+        removed = -1
+        for index in range(8):
+            child = children[node, index]
+            if child < 0:
+                continue
+            sum_red[node] += sum_red[child]
+            sum_green[node] += sum_green[child]
+            sum_blue[node] += sum_blue[child]
+            pixel_count[node] += pixel_count[child]
+            pixel_count[child] = 0
+            removed += 1
+        leaf_count -= removed
+    return leaf_count
+
+
+class OctreeQuantizer(object):
+    """
+    Clase de cuantificador de octárbol para cuantificación de imágenes
+      use MAX_DEPTH para limitar una cantidad de niveles
+      los nodos se guardan como índices en arreglos (estructura de arreglos):
+        children[n, i]  índice del hijo 'i' del nodo 'n' (-1 si no existe)
+        level[n]        profundidad del nodo 'n'
+        first_pixel[n]  número del primer píxel que pasó por el nodo 'n';
+                        ordena la reducción dentro de cada nivel para que
+                        no dependa del orden de creación de los nodos
+        sum_red/green/blue[n], pixel_count[n]  sumas de los colores del nodo
+      las sumas son int32 mientras no puedan desbordarse (hasta ~8M píxeles)
+      y pasan a int64 con imágenes más grandes
     """
 
-    def __init__(self,level, parent):
+    MAX_DEPTH = 8
+    INITIAL_NODES = 4096
+    # mínimo de píxeles por hilo para que valga la pena dividir la imagen
+    THREAD_PIXELS = 1 << 18
+    # primer píxel de un nodo que todavía no tiene ninguno
+    NO_PIXEL = np.iinfo(np.int64).max
+
+    def __init__(self):
         """
-        inicializar nuevo nodo octárbol
-        : param level
-        : param parent:
+        cuantificador de octree init
         """
-        self.color = RGB_Color(0,0,0)
-        self.pixel_count = 0
-        self.palette_index = 0
-        self.children = [None for _ in xrange(8)]
-        # agregar nodo al nivel actual
-        if level < OctreeQuantizer.MAX_DEPTH - 1:
-            parent.add_level_node(level, self)
+        self.node_count = 0
+        self.total_pixels = 0
+        self.children = np.full((OctreeQuantizer.INITIAL_NODES, 8), -1, dtype=np.int32)
+        self.level = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.uint8)
+        self.first_pixel = np.full(OctreeQuantizer.INITIAL_NODES, OctreeQuantizer.NO_PIXEL,
+                                   dtype=np.int64)
+        self.sum_red = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.int32)
+        self.sum_green = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.int32)
+        self.sum_blue = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.int32)
+        self.pixel_count = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.int32)
+        self.palette_index = np.zeros(OctreeQuantizer.INITIAL_NODES, dtype=np.int32)
+        self.root = self.add_node(0)
 
-    def is_leaf(self):
+    def _grow(self):
         """
-        comprobar si el nodo es hoja
+        duplicar la capacidad de los arreglos de nodos
         :return:
         """
-        return self.pixel_count > 0
+        capacity = 2 * len(self.level)
+        fill = {'children': -1, 'first_pixel': OctreeQuantizer.NO_PIXEL}
+        for name in ('children', 'level', 'first_pixel', 'sum_red', 'sum_green',
+                     'sum_blue', 'pixel_count', 'palette_index'):
+            old = getattr(self, name)
+            new = np.full((capacity,) + old.shape[1:], fill.get(name, 0),
+                          dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
 
-    def get_leaf_nodes(self):
+    def _reserve(self, pixel_count):
         """
-        obtener todos los nodos hoja
+        contar 'pixel_count' píxeles más y pasar las sumas a int64
+          si ya podrían desbordar int32
+        :param pixel_count:
         :return:
         """
-        leaf_nodes = []
-        for i in xrange(8):
-            node = self.children[i]
-            if node:
-                if node.is_leaf():
-                    leaf_nodes.append(node)
-                else:
-                    leaf_nodes.extend(node.get_leaf_nodes())
-        return leaf_nodes
+        self.total_pixels += pixel_count
+        if self.sum_red.dtype == np.int32 and \
+                self.total_pixels * 255 > np.iinfo(np.int32).max:
+            for name in ('sum_red', 'sum_green', 'sum_blue', 'pixel_count'):
+                setattr(self, name, getattr(self, name).astype(np.int64))
 
-    def get_nodes_pixel_count(self):
+    def add_node(self, level):
         """
-        obtener una suma del recuento de píxeles para el nodo y sus hijos
+        reservar un nuevo nodo en 'level'
+        :param level:
+        :return: el índice del nuevo nodo
+        """
+        if self.node_count == len(self.level):
+            self._grow()
+        node = self.node_count
+        self.node_count += 1
+        self.level[node] = level
+        return node
+
+    def is_leaf(self, node):
+        """
+        comprobar si el nodo es hoja
+        :param node:
         :return:
         """
-        sum_count = self.pixel_count
-        for i in xrange(8):
-            node = self.children[i]
-            if node:
-                sum_count += node.pixel_count
-        return sum_count
+        return self.pixel_count[node] > 0
 
-    def add_color(self, color, level, parent):
+    def get_leaves(self):
         """
-        Agrega `color` al árbol
+        conseguir todas las hojas
+        :return: arreglo con los índices de los nodos hoja
         """
-        if level >= OctreeQuantizer.MAX_DEPTH:
-            self.color.red += color.red
-            self.color.green += color.green
-            self.color.blue += color.blue
-            self.pixel_count += 1
-            return
-        index = self.get_color_index_for_level(color, level)
-        if not self.children[index]:
-            self.children[index] = OctreeNode(level, parent)
-        self.children[index].add_color(color, level + 1, parent)
+        return np.flatnonzero(self.pixel_count[:self.node_count] > 0)
 
-    def get_palette_index(self, color, level):
+    def get_nodes_pixel_count(self, node):
         """
-        Obtener índice de paleta para 'color'
-          usa 'nivel' para profundizar si el nodo no es una hoja
-        :param color:
-        :param level:
+        obtener una suma del recuento de píxeles para el nodo y sus hijos
+        :param node:
         :return:
         """
-        if self.is_leaf():
-            return self.palette_index
-        index = self.get_color_index_for_level(color, level)
-        if self.children[index]:
-            return self.children[index].get_palette_index(color, level+1)
-        else:
-            # obtener el índice de paleta para el primer nodo hijo encontrado
-            for i in xrange(8):
-                if self.children[i]:
-                    return self.children[i].get_palette_index(color, level+1)
-
-    def remove_leaves(self):
-        """
-        agregue todos los canales de color y recuento de píxeles secundarios al nodo principal
-        :return: la cantidad de hojas removidas
-        """
-        result = 0
-        for i in xrange(8):
-            node = self.children[i]
-            if node:
-                self.color.red += node.color.red
-                self.color.green += node.color.green
-                self.color.blue += node.color.blue
-                self.pixel_count += node.pixel_count
-                result += 1
-        return result - 1
-
-    def get_color_index_for_level(self,color,level):
-        """
-        obtener el índice para el siguiente 'nivel'
-        :param color:
-        :param level:
-        :return:
+        children = self.children[node]
+        return self.pixel_count[node] + self.pixel_count[children[children >= 0]].sum()
+
+    def get_colors(self, nodes):
         """
-        index = 0
-        mask = 0x80 >> level
-        if color.red & mask:
-            index |= 4
-        if color.green & mask:
-            index |= 2
-        if color.blue & mask:
-            index |= 1
-        return index
+        Obtenga el color promedio de todos los 'nodes' a la vez
+        :param nodes: arreglo con los índices de los nodos
+        :return: arreglo (len(nodes), 3) con los colores RGB
+        """
+        count = self.pixel_count[nodes]
+        return np.stack([self.sum_red[nodes] // count,
+                         self.sum_green[nodes] // count,
+                         self.sum_blue[nodes] // count], axis=1)
 
-    def get_color(self):
+    def add_color(self, red, green, blue):
         """
-        Obtenga un color promedio
+        agregar el color ('red', 'green', 'blue') al Octree
+          recibe los canales sueltos para no crear un RGB_Color por píxel
+        :param red:
+        :param green:
+        :param blue:
         :return:
         """
-        return RGB_Color(
-            self.color.red / self.pixel_count,
-            self.color.green / self.pixel_count,
-            self.color.blue / self.pixel_count)
-
-
-class OctreeQuantizer(object):
-    """
-    Clase de cuantificador de octárbol para cuantificación de imágenes
-      use MAX_DEPTH para limitar una cantidad de niveles
-    """
-
-    MAX_DEPTH = 8
+        first = self.total_pixels
+        self._reserve(1)
+        if self.node_count + OctreeQuantizer.MAX_DEPTH > len(self.level):
+            self._grow()
+        self.node_count = _add_color(
+            red, green, blue, first, self.children, self.level, self.first_pixel,
+            self.sum_red, self.sum_green, self.sum_blue, self.pixel_count,
+            self.node_count, OctreeQuantizer.MAX_DEPTH)
 
-    def __init__(self):
-        """
-        cuantificador de octree init
+    def add_colors(self, pixels, threads=None):
+        """
+        agregar todos los colores de 'pixels' al Octree
+          la inserción de cada píxel corre compilada con numba; con imágenes
+          grandes cada hilo construye su propio árbol con una franja de
+          píxeles y al final se suman todos al árbol actual
+        :param pixels: arreglo (N, 3) uint8 de colores RGB
+        :param threads: cantidad de hilos, por defecto uno por CPU
+        :return:
         """
-        self.levels = {i: [] for i in xrange(OctreeQuantizer.MAX_DEPTH)}
-        self.root = OctreeNode(0, self)
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1, 3)
+        if threads is None:
+            threads = os.cpu_count() or 1
+        threads = min(threads, len(pixels) // OctreeQuantizer.THREAD_PIXELS)
+        if threads <= 1:
+            self._insert(pixels)
+            return
+        slabs = np.array_split(pixels, threads)
+        trees = [OctreeQuantizer() for _ in slabs]
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(OctreeQuantizer._insert, trees, slabs))
+        for tree in trees:
+            self.merge(tree)
 
-    def get_leaves(self):
+    def _insert(self, pixels):
         """
-        conseguir todas las hojas
+        insertar 'pixels' en este árbol en el hilo actual
+        :param pixels: arreglo (N, 3) uint8 contiguo
         :return:
         """
-        return [node for node in self.root.get_leaf_nodes()]
+        offset = self.total_pixels
+        self._reserve(len(pixels))
+        # el código de Morton es el camino completo del color en el árbol
+        codes = morton_code(pixels[:, 0], pixels[:, 1], pixels[:, 2])
+        start = 0
+        while start < len(pixels):
+            if self.node_count + OctreeQuantizer.MAX_DEPTH > len(self.level):
+                self._grow()
+            self.node_count, start = _add_colors(
+                pixels, codes, start, offset, self.children, self.level,
+                self.first_pixel, self.sum_red, self.sum_green, self.sum_blue,
+                self.pixel_count,
+                self.node_count, OctreeQuantizer.MAX_DEPTH)
 
-    def add_level_node(self, level, node):
+    def merge(self, other):
         """
-        agregar 'nodo' a los nodos en el 'nivel'
-        :param level:
-        :param node:
+        agregar todos los colores del Octree 'other' a este Octree
+          como si sus píxeles se hubieran agregado después de los actuales
+        :param other:
         :return:
         """
-        self.levels[level].append(node)
+        offset = self.total_pixels
+        self._reserve(other.total_pixels)
+        while self.node_count + other.node_count > len(self.level):
+            self._grow()
+        self.node_count = _merge(
+            self.children, self.level, self.first_pixel, self.sum_red,
+            self.sum_green, self.sum_blue, self.pixel_count, self.node_count,
+            other.children[:other.node_count], other.first_pixel, other.sum_red,
+            other.sum_green, other.sum_blue, other.pixel_count, offset)
 
-    def add_color(self,color):
+    def remove_leaves(self, nodes, leaf_count, color_count=0):
         """
-        agregar 'color' al Octree
-        :param color:
-        :return:
+        agregue todos los canales de color y recuento de píxeles secundarios
+          a los nodos principales 'nodes', en orden, que pasan a ser hojas;
+          se detiene cuando quedan 'color_count' hojas o menos
+        :param nodes: arreglo con los índices de los nodos a reducir
+        :param leaf_count: cantidad de hojas antes de reducir
+        :param color_count:
+        :return: la cantidad de hojas después de reducir
         """
-        #  pasa el valor propio como 'padre' para guardar los nodos en los niveles dictados
-        self.root.add_color(color, 0, self)
+        return _remove_leaves(nodes, self.children, self.sum_red, self.sum_green,
+                              self.sum_blue, self.pixel_count, leaf_count,
+                              color_count)
 
     def make_palette(self, color_count):
         """
@@ -177,36 +449,65 @@ class OctreeQuantizer(object):
         :param color_count:
         :return:
         """
-        palette = []
-        palette_index = 0
-        leaf_count = len(self.get_leaves())
+        leaf_count = np.count_nonzero(self.pixel_count[:self.node_count])
+        level = self.level[:self.node_count]
+        first_pixel = self.first_pixel[:self.node_count]
         """
         reducir los nodos
         se pueden reducir hasta 8 colores y el menor número de colores debe ser 248
         """
-        for level in xrange(OctreeQuantizer.MAX_DEPTH - 1, -1, -1):
-            if self.levels[level]:
-                for node in self.levels[level]:
-                    leaf_count -= node.remove_leaves()
-                    if leaf_count <= color_count:
-                        break
-                if leaf_count <= color_count:
-                    break
-                self.levels[level] = []
-        # paleta de construcción
-        for node in self.get_leaves():
-            if palette_index >= color_count:
+        for depth in range(OctreeQuantizer.MAX_DEPTH - 1, -1, -1):
+            nodes = np.flatnonzero(level == depth)
+            nodes = nodes[np.argsort(first_pixel[nodes], kind='stable')]
+            leaf_count = self.remove_leaves(nodes, leaf_count, color_count)
+            if leaf_count <= color_count:
                 break
-            if node.is_leaf():
-                palette.append(node.get_color())
-            node.palette_index = palette_index
-            palette_index += 1
-        return palette
+        # paleta de construcción
+        leaves = self.get_leaves()
+        leaves = leaves[np.argsort(first_pixel[leaves], kind='stable')][:color_count]
+        self.palette_index[leaves] = np.arange(len(leaves))
+        return [RGB_Color(*color) for color in self.get_colors(leaves).tolist()]
+
+    def get_palette_index(self, red, green, blue):
+        """
+        obtener índice de paleta para el color ('red', 'green', 'blue')
+        :param red:
+        :param green:
+        :param blue:
+        :return:
+        """
+        return _get_palette_index(red, green, blue, self.children,
+                                  self.pixel_count, self.palette_index)
+
+    def get_palette_lut(self, colors):
+        """
+        tabla de índices de paleta para todos los colores de 24 bits
+          solo se baja por el árbol una vez por cada color distinto de 'colors'
+        :param colors: arreglo uint32 de colores empaquetados 0xRRGGBB
+        :return: arreglo (2**24,) con el índice de paleta de cada color
+        """
+        colors = np.unique(colors)
+        palette_size = self.palette_index[:self.node_count].max()
+        lut = np.zeros(1 << 24, dtype=np.min_scalar_type(palette_size))
+        lut[colors] = self._get_palette_indices(colors)
+        return lut
+
+    def get_palette_indices(self, pixels):
+        """
+        obtener índices de paleta para todos los colores de 'pixels'
+        :param pixels: arreglo (..., 3) uint8 de colores RGB
+        :return:
+        """
+        colors = pack_colors(pixels)
+        unique, inverse = np.unique(colors, return_inverse=True)
+        return self._get_palette_indices(unique)[inverse].reshape(colors.shape)
 
-    def get_palette_index(self,color):
+    def _get_palette_indices(self, colors):
         """
-        obtener índice de paleta para 'color'
-        :param color:
+        bajar por el árbol una vez por cada color empaquetado de 'colors'
+        :param colors: arreglo uint32 de colores empaquetados 0xRRGGBB
         :return:
         """
-        return self.root.get_palette_index(color, 0)
\ No newline at end of file
+        codes = morton_code(colors >> 16, colors >> 8, colors)
+        return _get_palette_indices(codes, self.children, self.pixel_count,
+                                    self.palette_index)
@@ -1,9 +1,146 @@
-import random
-import heapq
+import math
 
-# Infinito positivo y negativo. En Python 3.5 puede math.inf and -math.inf
-PINF =  float('inf')
-NINF = -float('inf')
+import numpy as np
+from numba import njit
+
+# distancia euclidiana compilada entre la fila 'node' de pivots y pt
+@njit(cache=True, boundscheck=False)
+def _distance(pivots, node, pt):
+    squareSums = 0.0
+    for dim in range(pt.shape[0]):
+        diff = pivots[node, dim] - pt[dim]
+        squareSums += diff * diff
+    return math.sqrt(squareSums)
+
+# versión compilada de find sobre el árbol aplanado
+# devuelve el índice del nodo cuya clave es pt, o -1 si no está
+@njit(cache=True, boundscheck=False)
+def _find(pivots, radii, left, right, pt):
+    
+    if _distance(pivots, 0, pt) > radii[0]: return -1
+    
+    # pila explícita en lugar de recursividad
+    stack = np.empty(pivots.shape[0], dtype=np.int32)
+    stack[0] = 0
+    top = 1
+    while top > 0:
+        top -= 1
+        cur = stack[top]
+        
+        # si se encuentra una coincidencia exacta, devuelve el nodo
+        match = True
+        for dim in range(pt.shape[0]):
+            if pivots[cur, dim] != pt[dim]:
+                match = False
+                break
+        if match: return cur
+        
+        # apilar los hijos cuya bola podría contener el pt, el más cercano
+        # al pt arriba para revisarlo primero y terminar antes si está ahí
+        first = left[cur]
+        second = right[cur]
+        distFirst = _distance(pivots, first, pt) if first >= 0 else np.inf
+        distSecond = _distance(pivots, second, pt) if second >= 0 else np.inf
+        if distSecond < distFirst:
+            first, second = second, first
+            distFirst, distSecond = distSecond, distFirst
+        if second >= 0 and distSecond <= radii[second]:
+            stack[top] = second
+            top += 1
+        if first >= 0 and distFirst <= radii[first]:
+            stack[top] = first
+            top += 1
+    
+    return -1
+
+# versión compilada de knnFind sobre el árbol aplanado
+# dists/ids forman un heap máximo por distancia: dists[0] es la peor distancia
+# el heap crece hasta N elementos y después solo se reemplaza su raíz,
+# así no hay lugares vacíos que comparar
+# devuelve (dists, ids) con los size elementos encontrados
+@njit(cache=True, boundscheck=False)
+def _knnFind(pivots, radii, left, right, pt, N):
+    
+    dists = np.empty(N)
+    ids = np.empty(N, dtype=np.int64)
+    size = 0
+    
+    # cada nodo se apila con su distancia al pt
+    stack = np.empty(pivots.shape[0], dtype=np.int32)
+    stackDists = np.empty(pivots.shape[0])
+    stack[0] = 0
+    stackDists[0] = _distance(pivots, 0, pt)
+    top = 1
+    while top > 0:
+        top -= 1
+        cur = stack[top]
+        dist = stackDists[top]
+        
+        # si la bola del nodo no se cruza con la de la peor distancia,
+        # ningún punto del subárbol puede entrar al heap
+        if size == N and dist > dists[0] + radii[cur]: continue
+        
+        # dist != 0 asegura que estamos ignorando el punto que nos dieron
+        if dist != 0 and size < N:
+            # agregar al final del heap y subirlo
+            i = size
+            size += 1
+            while i > 0:
+                parent = (i - 1) // 2
+                if dists[parent] >= dist: break
+                dists[i] = dists[parent]
+                ids[i] = ids[parent]
+                i = parent
+            dists[i] = dist
+            ids[i] = cur
+        elif dist != 0 and dist < dists[0]:
+            # reemplazar la raíz del heap y hundirla
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= N: break
+                if child + 1 < N and dists[child + 1] > dists[child]: child += 1
+                if dists[child] <= dist: break
+                dists[i] = dists[child]
+                ids[i] = ids[child]
+                i = child
+            dists[i] = dist
+            ids[i] = cur
+        
+        # apilar los hijos de modo que quede arriba el de menor
+        # dist - radio (la bola más cercana), así la peor distancia
+        # baja antes y se poda más del otro subárbol
+        first = left[cur]
+        second = right[cur]
+        distFirst = _distance(pivots, first, pt) if first >= 0 else np.inf
+        distSecond = _distance(pivots, second, pt) if second >= 0 else np.inf
+        if second >= 0 and (first < 0 or distSecond - radii[second] < distFirst - radii[first]):
+            first, second = second, first
+            distFirst, distSecond = distSecond, distFirst
+        if second >= 0:
+            stack[top] = second
+            stackDists[top] = distSecond
+            top += 1
+        if first >= 0:
+            stack[top] = first
+            stackDists[top] = distFirst
+            top += 1
+    
+    return dists[:size], ids[:size]
+
+# knnFind compilado para cada fila de pts
+# devuelve matrices Q x N; los lugares vacíos tienen distancia inf e índice -1
+@njit(cache=True, boundscheck=False)
+def _batchKnnFind(pivots, radii, left, right, pts, N):
+    
+    dists = np.full((pts.shape[0], N), np.inf)
+    ids = np.full((pts.shape[0], N), -1, dtype=np.int64)
+    for q in range(pts.shape[0]):
+        qDists, qIds = _knnFind(pivots, radii, left, right, pts[q], N)
+        dists[q, :qDists.shape[0]] = qDists
+        ids[q, :qIds.shape[0]] = qIds
+    
+    return dists, ids
 
 # clase de nodo que compone el MTree
 class Node(object):
@@ -45,163 +182,122 @@ class MTree(object):
         # como parte del constructor, construya el MTree
         # comenzando en el nodo raíz
         self.__construct(self.__root, kd)
-    
-    # si se encuentra pt, devuelve data; de lo contrario, devuelve None
-    def find(self, ptToFind):
-        
-        # si la distancia del pt al pivote de la raíz es mayor
-        # que la dist desde el pivote hasta el punto más lejano en el Mtree (radio)
-        # entonces el pt no existe en el árbol de bolas, así que devuelve falso
-        if(self.__distance(ptToFind, self.__root.getPivotKey()) > self.__root.radius):
-            return None           
         
-        # de lo contrario, continúe buscando el pt dentro del árbol, comenzando en la raíz
-        return self.__find(ptToFind, self.__root)
+        # aplanar el árbol en arreglos para las búsquedas compiladas
+        self.__flatten()
     
-    # invocado por find      
-    def __find(self, ptToFind, curNode):
-        
-        # si se encuentra una coincidencia exacta, devuelve data
-        if(curNode.getPivotKey() == ptToFind): return curNode.getPivotData()
-        
-        # si ambos hijos existen y nuestro punto podría estar en cualquiera de ellos,
-        # recurrir a ambos para ver dónde está, si es que está allí
-        if(curNode.rightChild and self.__ptInBall(ptToFind, curNode.rightChild) and\
-           curNode.leftChild and self.__ptInBall(ptToFind, curNode.leftChild)):
-                
-                leftFind = self.__find(ptToFind, curNode.leftChild)
-                rightFind = self.__find(ptToFind, curNode.rightChild)
-                
-                # si se encuentra pt en cualquiera de los niños, devuelva los datos
-                if leftFind: return leftFind
-                elif rightFind: return rightFind
-                
-        # Si la pt solo podría estar en el hijo izquierdo, se usa recursividad  
-        elif(curNode.leftChild and self.__ptInBall(ptToFind, curNode.leftChild)):
-            leftFind = self.__find(ptToFind, curNode.leftChild)
-            # si se encuentra, devuelve datos
-            if leftFind: return leftFind
-            
-        # si el pt solo pudiera estar en el hijo derecho, se usa recursividad
-        elif(curNode.rightChild and self.__ptInBall(ptToFind, curNode.rightChild)):
-            # si se encuentra, devuelve datos
-            rightFind = self.__find(ptToFind, curNode.rightChild)
-            if rightFind: return rightFind
-             
-        # si hemos llegado a este punto, hemos buscado completamente en el árbol
-        # y no he encontrado una coincidencia, así que devuelva None
-        return None        
+    # numera los nodos (la raíz es el 0) y guarda el árbol en arreglos:
+    # pivots[i] = clave del nodo i, radii[i] = radio del nodo i,
+    # left[i] / right[i] = índice del hijo izquierdo / derecho o -1
+    def __flatten(self):
+        
+        self.__nodes = [self.__root]
+        i = 0
+        while i < len(self.__nodes):
+            cur = self.__nodes[i]
+            if cur.leftChild: self.__nodes.append(cur.leftChild)
+            if cur.rightChild: self.__nodes.append(cur.rightChild)
+            i += 1
+        
+        ids = {id(node): i for i, node in enumerate(self.__nodes)}
+        self.__pivots = np.array([node.getPivotKey() for node in self.__nodes], dtype=np.float64)
+        self.__radii = np.array([node.radius for node in self.__nodes], dtype=np.float64)
+        self.__left = np.array([ids[id(node.leftChild)] if node.leftChild else -1
+                                for node in self.__nodes], dtype=np.int32)
+        self.__right = np.array([ids[id(node.rightChild)] if node.rightChild else -1
+                                 for node in self.__nodes], dtype=np.int32)
     
-    # invocado por _find para comprobar si un punto podría estar dentro de un niño
-    def __ptInBall(self, pt, node):
+    # convierte un punto de consulta al formato de los arreglos
+    def __asPoint(self, pt):
         
-        
-        # si dist <= radio: return True bc pt posiblemente podría encontrarse
-        # en esa bola
-        # si dist > radius: return False bc pt no se pudo encontrar
-        # en esa bola
-        return self.__distance(node.getPivotKey(), pt) <= node.radius
+        if(len(pt) != self.__numDim): raise Exception("ERROR point " + str(pt) + " has an incorrect number of dimensions")
+        return np.asarray(pt, dtype=np.float64)
     
-    # devuelve verdadero si el nodo hoja, falso si no
-    def __isLeaf(self, cur): return not (cur.rightChild or cur.leftChild)        
+    # si se encuentra pt, devuelve data; de lo contrario, devuelve None
+    def find(self, ptToFind):
+        
+        # la búsqueda recorre el árbol aplanado con una pila, revisando
+        # solo los hijos cuya bola podría contener el pt
+        cur = _find(self.__pivots, self.__radii, self.__left, self.__right,
+                    self.__asPoint(ptToFind))
+        
+        # si no se encontró una coincidencia, devuelva None
+        if cur < 0: return None
+        return self.__nodes[cur].getPivotData()
     
     # ingrese un pt y cuántos vecinos (N) desea encontrar y devuelve
-    # una lista de N vecinos más cercanos a pt
+    # una lista de N vecinos más cercanos a pt, del más cercano al más lejano
+    # cada elemento = tupla de (dist, Key, Data)
     def knnFind(self, pt, N):
         
-        # crea un heap con N elementos
-        # elemento: (distToPt, Key, Data)
-        # nota: usaremos heapq así que invertimos los valores para tener la implementación de un heap máximo
-
-        # los primeros n elementos tienen un dist imposible de NINF que
-        # lo reduciremos más tarde
-        # cada elemento = tupla de (invertedDist, Key, Data)
-        heap = [(NINF, None, None)]*N
+        if(N <= 0): raise Exception("ERROR number of neighbors must be > 0")
+        
+        dists, ids = _knnFind(self.__pivots, self.__radii, self.__left, self.__right,
+                              self.__asPoint(pt), N)
         
-        # heap es una lista y es mutible, así que mutelo
-        # para incluir los N vecinos más cercanos
-        # nota: dado que el montón es mutible, no es necesario reasignar la var
-        self.__knnFind(pt, self.__root, heap)
+        heap = []
+        for i in np.argsort(dists, kind="stable"):
+            node = self.__nodes[ids[i]]
+            heap.append((float(dists[i]), node.getPivotKey(), node.getPivotData()))
         
         # si no hubiera suficientes datos para dar n vecinos más cercanos,
-        # reemplazar lugares 'vacíos' con str 'datos insuficientes'
-        for i in range(len(heap)):
-            
-            if heap[i][0] == NINF:
-                heap[i] = "insufficient data"
-            else:
-                heap[i] = (-(heap[i][0]),) + heap[i][1:]
+        # completar con el str 'datos insuficientes'
+        heap += ["insufficient data"]*(N - len(heap))
         
-        # devolver el montón actualizado
         return heap
     
-
-    def __knnFind(self, pt, curNode, heap):
-
-        # dist invertida
-        dist = -self.__distance(curNode.getPivotKey(), pt)
-        
-        # la peor distancia está en la posición 0 del montón desde
-        # heap máximo invertido
-        worstDist = heap[0][0]
-        
-        # si esta dist de nuestro pt al nodo actual es
-        # mejor que la peor distancia en el heap, actualice el heap
-        # dist! = 0 asegura que estamos ignorando el punto que nos dieron
-        if dist > worstDist and dist != 0:
-            heapq.heappushpop(heap, (dist, curNode.getPivotKey(), curNode.getPivotData()))
-        
-    
-        # si existe un hijo adecuado y los círculos formados por el
-        # WorstDist de nuestro pt y la distancia de nuestro pt al
-        # superposición de pivote, recursividad
-        if(curNode.rightChild and self.__circlesIntersect(pt, curNode.rightChild, worstDist)):
-
-            # nota: dado que el heap es mutable, no necesitamos reasignar la var
-            self.__knnFind(pt, curNode.rightChild, heap)
-                
-        # si existe un hijo adecuado y los círculos formados por el
-        # WorstDist de nuestro pt y la distancia de nuestro pt al
-        # superposición de pivote, recursividad          
-        if(curNode.leftChild and self.__circlesIntersect(pt, curNode.leftChild, worstDist)):
-            
-            # nota: dado que el heap es mutable, no necesitamos reasignar la var
-            self.__knnFind(pt, curNode.leftChild, heap) 
-        
-        # si llegamos a este punto, hemos recurrido a un nodo hoja
-        # así que devuelve el heap
-        return heap
-        
-    # los círculos se cruzan cuando la distancia entre pivotes <= suma de radios
-    # invocado por la función knn
-    def __circlesIntersect(self, pt, cur, worstDist):
-        
-        distBtwnPiv = self.__distance(pt, cur.getPivotKey())
-        # usa neg WorstDist para deshacerlo
-        # nota: dist se invirtió para permitir una estructura de montón máxima
-        sumRadii = -worstDist + cur.radius                    
-        
-        return distBtwnPiv <= sumRadii
+    # igual que knnFind pero para una matriz de Q puntos (Q x numDim),
+    # todas las consultas se resuelven en una sola llamada compilada;
+    # devuelve una lista por punto
+    def batchKnnFind(self, pts, N):
+        
+        if(N <= 0): raise Exception("ERROR number of neighbors must be > 0")
+        
+        pts = np.ascontiguousarray(pts, dtype=np.float64)
+        if(pts.ndim != 2 or pts.shape[1] != self.__numDim): raise Exception("ERROR points must have shape (Q, " + str(self.__numDim) + ")")
+        
+        dists, ids = _batchKnnFind(self.__pivots, self.__radii, self.__left, self.__right, pts, N)
+        
+        # ordenar los vecinos de cada punto, los lugares vacíos (PINF) quedan al final
+        order = np.argsort(dists, axis=1, kind="stable")
+        dists = np.take_along_axis(dists, order, axis=1).tolist()
+        ids = np.take_along_axis(ids, order, axis=1).tolist()
+        
+        result = []
+        for q in range(len(pts)):
+            heap = []
+            for dist, i in zip(dists[q], ids[q]):
+                if i < 0:
+                    heap.append("insufficient data")
+                else:
+                    node = self.__nodes[i]
+                    heap.append((dist, node.getPivotKey(), node.getPivotData()))
+            result.append(heap)
+        
+        return result
     
     # devuelve kd sin dupKeys y deja que el cliente
     # saber si no se agregó un valor bc de la clave dup
     def __noDupKeys(self, kd):
         
-        keys = []
+        # las claves son tuplas, así que un set revisa los dup en O(1)
+        keys = set()
         noDup = []
         for i in range(len(kd)):
             k = kd[i][0]
             # solo agregue el valor kd si k no es dup
             if k not in keys:
-                noDup+=[kd[i]]
-                keys+=[k]
+                noDup.append(kd[i])
+                keys.add(k)
             else:
-                print("duplicate value: ", kd, " not added")
+                print("duplicate value: ", kd[i], " not added")
         
         return noDup
     
     # Construye el árbol, invocado por el constructor.
-    def __construct(self, cur, kd):  
+    # keys es la matriz de claves de kd, se calcula una vez en la raíz
+    # y los hijos reciben sus filas
+    def __construct(self, cur, kd, keys = None):  
         
         numPts = len(kd)
         
@@ -212,59 +308,45 @@ class MTree(object):
             if numPts == 0: raise Exception("ERROR empty list inserted")
             kd = self.__noDupKeys(kd) 
       
+            # si un pt no tiene el mismo número de dimensiones
+            # según el número de dimensiones especificado por el usuario, arroje
+            # una excepción
+            for keyDat in kd:
+                if(len(keyDat[0]) != self.__numDim): raise Exception("ERROR point " + str(keyDat) + " has an incorrect number of dimensions")
+        
+            # claves de los puntos como matriz numPts x numDim
+            keys = np.asarray([keyDat[0] for keyDat in kd], dtype=np.float64)
+        
+        numPts = len(kd)
+      
         # obtener la dimensión con la extensión máxima,
         # tenga en cuenta que las dimensiones comienzan desde 0
-        dimGreatestSpread = self.__getDimGreatestSpread(kd)
+        dimGreatestSpread = self.__getDimGreatestSpread(keys)
         
         # obtener el valor de pivote
-        # Aproximaremos la mediana y la usaremos como pivote
-        numMedians = 5                               # realizaremos una mediana de 5 para obtener la mediana
-        if(numPts < numMedians): numMedians = numPts
-        medians = []                                 # para ser llenado con numMedian número de nodos
-        
-        # rellenar medianas con numMedians nodos aleatorios en kd
-        for i in range(numMedians): medians+=[kd[random.randint(0, numPts-1)]]
-        
-        # Ordene la matriz de la mediana en la dimensión con la mayor dispersión
-        self.__selectionSort(medians, dimGreatestSpread)
-        
-        # el nodo mediano es el nodo en el medio del
-        # ahora ordenada la matriz de medianas, y ese nodo será nuestro
-        # pivote
-        pivot = medians[len(medians)//2]
-        
-        # split basado en pivote
-        leftChildren = []
-        rightChildren = []
+        # el pivote es la mediana exacta de todos los puntos en la dimensión
+        # con la mayor dispersión, así el árbol queda balanceado
+        vals = keys[:, dimGreatestSpread]
+        pivotIdx = np.argpartition(vals, numPts//2)[numPts//2]
+        pivot = kd[pivotIdx]
         
         # dividir nodos basados ​​en pivote
-        # revise cada punto de la lista y agregue
-        # al clúster secundario izquierdo o derecho basado en pivote
-        for keyDat in kd:
-            
-            # data es el primer elemento
-            curKey = keyDat[0]
-            pivKey = pivot[0]
-            
-            # si un pt no tiene el mismo número de dimensiones
-            # según el número de dimensiones especificado por el usuario, arroje
-            # una excepción
-            if(len(curKey) != self.__numDim): raise Exception("ERROR point " + str(keyDat) + " has an incorrect number of dimensions")
-            
-            # omitir el punto de pivote
-            if(keyDat != pivot):
-            
-                if(curKey[dimGreatestSpread] > pivKey[dimGreatestSpread]):
-                    rightChildren += [keyDat]
-                elif(curKey[dimGreatestSpread] <= pivKey[dimGreatestSpread]):
-                    leftChildren += [keyDat]
+        # cada punto va al clúster secundario izquierdo o derecho según su
+        # valor en la dimensión de mayor dispersión, omitiendo el pivote
+        rightMask = vals > vals[pivotIdx]
+        leftMask = ~rightMask
+        leftMask[pivotIdx] = False
+        rightIdx = np.flatnonzero(rightMask)
+        leftIdx = np.flatnonzero(leftMask)
+        rightChildren = [kd[i] for i in rightIdx.tolist()]
+        leftChildren = [kd[i] for i in leftIdx.tolist()]
         
         # en este punto, leftChildren y rightChildren son listas de puntos (tuplas) que incluyen el pt y los datos
         # divididos por el valor de pivote
         
         # establecer atributos de nodo
         cur.pivot = pivot
-        cur.radius = self.__furthestRadius(pivot, kd)
+        cur.radius = self.__furthestRadius(keys[pivotIdx], keys)
         
         # si hay ptos secundarios izquierdo / derecho, cree los nodos izquierdo / derecho
         # y aplicar recursividad hacia abajo para construir
@@ -276,20 +358,20 @@ class MTree(object):
         # construye los niños adecuados
         elif(leftChildren == []):
             cur.rightChild = Node()
-            self.__construct(cur.rightChild, rightChildren)
+            self.__construct(cur.rightChild, rightChildren, keys[rightIdx])
         
         # si quedan hijos y no hay hijos correctos
         # construye los hijos de la izquierda
         elif(rightChildren == []): 
             cur.leftChild = Node()
-            self.__construct(cur.leftChild, leftChildren)  
+            self.__construct(cur.leftChild, leftChildren, keys[leftIdx])  
         
         # si hay hijos tanto derecho como izquierdo, construya ambos
         else:
             cur.rightChild = Node()
             cur.leftChild = Node()
-            self.__construct(cur.rightChild, rightChildren)
-            self.__construct(cur.leftChild, leftChildren)
+            self.__construct(cur.rightChild, rightChildren, keys[rightIdx])
+            self.__construct(cur.leftChild, leftChildren, keys[leftIdx])
              
         
         # si esta fue la primera recursividad, establezca el primer nodo
@@ -298,106 +380,23 @@ class MTree(object):
         if(cur == self.__root):
             self.__root = cur
             
-    def __furthestRadius(self, pivot, kd):
-        
-        greatestR = 0 # Establecer el mayor radio al más bajo que podría ser
-        
-        # recorrer cada punto en el nodo
-        for keyDat in kd:
-            # la clave es el primer elemento
-            key = keyDat[0]
-            # pasa por cada dimensión
-            for dim in range(self.__numDim):
-                
-                # obtener la distancia entre el punto actual y el pivote (este es el radio)
-                # los datos son el primer elemento en pivote (por eso ingresamos pivote [0])
-                dist = self.__distance(pivot[0], key)
-                
-                # si la distancia es mayor que el radio mayor
-                # establece el radio más grande para que sea esta distancia
-                if(dist > greatestR): greatestR = dist
-                    
-        return greatestR   
-            
-            
-   # return dist euclidiana
-   # dist_euclidiana = sqrt(sum from 1 to n of (qsubi - psubi)**2)
-    def __distance(self, pt1, pt2):
-       
-        squareSums = 0.0
-        
-        # sume la diferencia al cuadrado de cada dim de
-        # cada pt
-        for dim in range(self.__numDim): squareSums += (pt1[dim] - pt2[dim])**2
+    def __furthestRadius(self, pivot, keys):
         
-        return squareSums**(1/2)
-    
-    # ordenar matriz de nodos por valor en dimensiones específicas 
-    def __selectionSort(self, kd, dim):
-        
-        length = len(kd)
-        
-        # pasar por el orden de selección
-        for outer in range(length-1):
-            min = outer
-            for inner in range(outer+1, length):
-                
-                # 0 es el índice de los datos
-                dat = kd[inner][0][dim]
-                minDat = kd[min][0][dim]
-                
-                if dat < minDat: min = inner
+        # distancia de cada punto en el nodo al pivote (este es el radio)
+        # y se queda con la mayor
+        return float(np.sqrt(((keys - pivot)**2).sum(axis=1)).max())
+            
             
-            # swap
-            kd[outer], kd[min] = kd[min], kd[outer]
-    
     # devolver la dimensión con la mayor difusión
-    def __getDimGreatestSpread(self,kd):
-        
-        # dado que se supone que todos los nodos tienen la misma atenuación,
-        # podemos obtener el número de dimensiones de
-        # el primer nodo de la lista
+    def __getDimGreatestSpread(self, keys):
         
-        # crea una lista para almacenar los diferenciales de cada dim
-        # para que podamos ver cuál es el mejor
-        spreads = [0]*self.__numDim
-        
-        # encuentra la luz de mayor difusión
-        # para cada dimensión
-        for dim in range(self.__numDim):
-            
-            # empezar con los valores más extremos
-            minVal = PINF
-            maxVal = NINF
-            
-            # recorrer cada nodo en la lista ingresada
-            for pt in kd:
-                
-                # la clave es el primer valor de la tupla
-                key = pt[0]
-                
-                # si ese valor es menor que el mínimo anterior
-                # valor, establézcalo en minVal
-                if(key[dim] < minVal):
-                    minVal = key[dim]
-                
-                # si ese valor es mayor que el anterior
-                # valor máximo, configúrelo en maxVal
-                if(key[dim] > maxVal):
-                    maxVal = key[dim]
-                    
-            # establecer la extensión de esa dimensión en maxVal - minVal
-            spreads[dim] = maxVal-minVal
-        
-        # comience con la propagación máxima siendo el primer valor
-        dimGreatestSpread = 0
+        # la extensión de cada dimensión es maxVal - minVal,
+        # calculada para todas las dimensiones a la vez
+        spreads = np.ptp(keys, axis=0)
         
         # ver qué dimensión tiene la mayor difusión
-        for i in range(1,self.__numDim):
-            if(spreads[i] > spreads[dimGreatestSpread]):
-                dimGreatestSpread = i
-        
-        return dimGreatestSpread
+        # (en un empate gana la primera)
+        return int(spreads.argmax())
     
     # imprime el árbol en grupos de puntos          
     def pTree(self):